@@ -7,11 +7,15 @@ Basic usage with prompt:
 python gemini-imgen.py "Your prompt here"
 With custom output filename:
 python gemini-imgen.py "Your prompt here" --output my_custom_image.png
+With a fixed seed (used by generate_item_icons.py when retrying a rejected image):
+python gemini-imgen.py "Your prompt here" --seed 42
 The script will:
 
 Display the prompt being used
 Show any generated text description
 Save the image with the specified filename
+Validate the image (decodable, not fully transparent, not blank) before saving it; a missing or invalid
+image exits with code 3, other errors with code 1
 Display the generated image
 Handle any errors gracefully
 Let me know if you'd like to:
@@ -24,18 +28,64 @@ Add more detailed error handling
 import argparse
 from google import genai
 from google.genai import types
-from PIL import Image
+from PIL import Image, ImageStat
 from io import BytesIO
 import os
+import sys
 import dotenv
 dotenv.load_dotenv()    
-def generate_image(prompt, output_filename):
+# Exit code for a missing or invalid image, the only failure a retry with a new seed can fix
+INVALID_IMAGE_EXIT_CODE = 3
+
+class InvalidImageError(ValueError):
+    """Raised when the response contains no image or the image fails validation"""
+
+def decode_image(data, min_alpha_coverage=0.01, min_stddev=2.0):
+    """
+    Decode image bytes returned by the API and run cheap sanity checks on them.
+    
+    Args:
+        data (bytes): Raw image data from the response
+        min_alpha_coverage (float): Minimum fraction of pixels that must not be fully transparent
+        min_stddev (float): Minimum pixel standard deviation for the image to count as non-blank
+        
+    Returns:
+        The decoded PIL image
+        
+    Raises:
+        InvalidImageError: If the image is not decodable, (almost) fully transparent or blank
+    """
+    try:
+        Image.open(BytesIO(data)).verify()
+        image = Image.open(BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise InvalidImageError(f"Image data is not decodable: {str(e)}")
+    
+    mask = None
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        alpha = image.convert('RGBA').getchannel('A')
+        coverage = sum(alpha.histogram()[1:]) / (image.width * image.height)
+        if coverage < min_alpha_coverage:
+            raise InvalidImageError(f"Image is almost fully transparent ({coverage:.1%} coverage)")
+        mask = alpha.point(lambda a: 255 if a else 0)
+    
+    stddev = ImageStat.Stat(image.convert('RGB'), mask).stddev
+    if max(stddev) < min_stddev:
+        raise InvalidImageError("Image appears to be blank")
+    return image
+
+def generate_image(prompt, output_filename, seed=None):
     """
     Generate an image using Gemini API based on the provided prompt.
     
     Args:
         prompt (str): The text prompt for image generation
         output_filename (str): The filename to save the generated image
+        seed (int): Optional seed, so a retry produces a different image
+        
+    Raises:
+        InvalidImageError: If the response contains no image or the image fails validation
     """
     # Initialize the client with your API key
     client = genai.Client(api_key=os.getenv('gemini_api_key'))
@@ -46,31 +96,48 @@ def generate_image(prompt, output_filename):
         model="gemini-2.0-flash-exp-image-generation",
         contents=prompt,
         config=types.GenerateContentConfig(
-            response_modalities=['Text', 'Image']
+            response_modalities=['Text', 'Image'],
+            seed=seed
         )
     )
 
-    for part in response.candidates[0].content.parts:
+    # Blocked or empty responses come back without candidates, content or parts
+    candidate = response.candidates[0] if response.candidates else None
+    if candidate is None or candidate.content is None or not candidate.content.parts:
+        raise InvalidImageError("Response did not contain an image")
+
+    saved = False
+    for part in candidate.content.parts:
         if part.text is not None:
             print(f"Description: {part.text}")
         elif part.inline_data is not None:
-            image = Image.open(BytesIO(part.inline_data.data))
+            image = decode_image(part.inline_data.data)
             image.save(output_filename)
+            saved = True
             print(f"Image saved as {output_filename}")
             image.show()
 
+    if not saved:
+        raise InvalidImageError("Response did not contain an image")
+
 def main():
     parser = argparse.ArgumentParser(description='Generate images using Gemini AI')
     parser.add_argument('prompt', type=str, help='The text prompt for image generation')
     parser.add_argument('--output', type=str, default='gemini-native-image.png', 
                        help='Output filename (default: gemini-native-image.png)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Seed for image generation (default: random)')
     
     args = parser.parse_args()
     
     try:
-        generate_image(args.prompt, args.output)
+        generate_image(args.prompt, args.output, seed=args.seed)
+    except InvalidImageError as e:
+        print(f"Invalid image: {str(e)}")
+        sys.exit(INVALID_IMAGE_EXIT_CODE)
     except Exception as e:
         print(f"Error generating image: {str(e)}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -2,16 +2,22 @@
 Item Icon Generator
 Description: This script reads the items from randomitems.js and uses gemini-imgen.py to generate
 an icon for each item. It saves the icons to a 'randomitems_icons' directory and includes progress
-tracking to support resuming if the process is interrupted.
+tracking to support resuming if the process is interrupted. Icons that are missing from the response
+or fail validation are requeued with a new seed before the batch ends.
 """
 import os
 import re
 import json
 import time
+import random
 import subprocess
 import argparse
+from collections import deque
 from pathlib import Path
 
+# Exit code gemini-imgen.py uses for a missing or invalid image (INVALID_IMAGE_EXIT_CODE there)
+INVALID_IMAGE_EXIT_CODE = 3
+
 def extract_items_from_js(js_file_path):
     """
     Extract item objects from the randomitems.js file
@@ -92,6 +98,8 @@ def main():
                         help='Run in test mode, processing only the first 3 items')
     parser.add_argument('--skip-first', type=int, default=0,
                         help='Skip the first N items (useful for resuming after test mode)')
+    parser.add_argument('--max-retries', type=int, default=2,
+                        help='Number of times a missing or invalid icon is requeued with a new seed (default: 2)')
     
     args = parser.parse_args()
     
@@ -137,10 +145,12 @@ def main():
         end_index = min(3, len(items))
         print(f"TEST MODE: Processing only the first {end_index} items")
     
-    # Process items
+    # Process items; failed items are appended to the queue again with a new seed
     batch_count = 0
+    queue = deque((i, 0) for i in range(start_index, end_index))
     
-    for i in range(start_index, end_index):
+    while queue:
+        i, attempt = queue.popleft()
         item = items[i]
         item_name = item['name']
         
@@ -162,6 +172,10 @@ def main():
         try:
             # Call gemini-imgen.py with the generated prompt
             cmd = ["python", gemini_script_path, prompt, "--output", output_path]
+            if attempt > 0:
+                seed = random.randint(0, 2**31 - 1)
+                cmd += ["--seed", str(seed)]
+                print(f"Retry {attempt}/{args.max_retries} with seed {seed}")
             
             # Run the command
             subprocess.run(cmd, check=True)
@@ -169,7 +183,7 @@ def main():
             # Update progress
             if item_name not in progress['completed']:
                 progress['completed'].append(item_name)
-            progress['last_index'] = i
+            progress['last_index'] = max(progress['last_index'], i)
             save_progress(progress_file, progress)
             
             # Show progress percentage
@@ -183,21 +197,29 @@ def main():
             
             # Batch processing
             batch_count += 1
-            if batch_count >= args.batch_size:
+            if batch_count == args.batch_size:
                 print(f"\nCompleted batch of {args.batch_size} items. Pausing...")
                 print(f"To continue, run the script again.")
                 print(f"To start over, use --force-restart")
-                break
-                
-            # Add delay between requests to avoid overloading the API
-            if i < end_index - 1:
-                print(f"Waiting {args.delay} seconds before next request...")
-                time.sleep(args.delay)
+                # Only the retries of this batch are still processed
+                queue = deque(entry for entry in queue if entry[1] > 0)
                 
         except Exception as e:
             print(f"Error generating icon for {item_name}: {str(e)}")
+            # Only a missing or invalid image can be fixed by a new seed; API key, quota and
+            # other errors would fail again
+            invalid_image = (isinstance(e, subprocess.CalledProcessError)
+                             and e.returncode == INVALID_IMAGE_EXIT_CODE)
+            if invalid_image and attempt < args.max_retries:
+                print(f"Requeuing {item_name} with a new seed")
+                queue.append((i, attempt + 1))
             # Still save progress so we don't lose track
             save_progress(progress_file, progress)
+        
+        # Add delay between requests to avoid overloading the API
+        if queue:
+            print(f"Waiting {args.delay} seconds before next request...")
+            time.sleep(args.delay)
     
     # Final status
     if args.test_mode:
@@ -4,8 +4,18 @@ import os
 import shutil
 import uuid
 import re
+import json
+import time
+import struct
+import random
+import statistics
+import tempfile
 import threading
 import argparse
+import itertools
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from gradio_client import Client, handle_file
 
 
@@ -15,6 +25,15 @@ from gradio_client import Client, handle_file
 # # Run automation mode in production (all images) with textured models
 # python automation.py --automation --mode production --input_folder input --output_folder output --automation_texture
 
+# # Calibrate the server once and save a tuning profile (picked up automatically by automation and GUI runs)
+# python automation.py --autotune --quality standard --input_folder input --profile tuning_profile.json
+
+# # Sweep seeds and guidance scales for every image (each image is uploaded once, variants run concurrently)
+# python automation.py --automation --input_folder input --output_folder output --sweep "{\"seed\": [1, 2, 3], \"guidance_scale\": [5.0, 7.5]}"
+
+# # Every generated GLB is validated; invalid models are requeued with a new seed (up to --max_retries times)
+# python automation.py --automation --input_folder input --output_folder output --min_triangles 1000 --max_triangles 500000
+
 
 # -----------------------
 # Helper Functions
@@ -33,26 +52,126 @@ def get_unique_filename(directory, base_name, extension):
             return path
         i += 1
 
+class ArtifactValidationError(ValueError):
+    """
+    Raised when a generated model fails validation. Retrying with a different seed may succeed.
+    """
+
+def count_glb_triangles(gltf):
+    """
+    Count the triangles of all mesh primitives described by a glTF JSON document.
+    """
+    accessors = gltf.get("accessors", [])
+    triangles = 0
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            if "indices" in primitive:
+                count = accessors[primitive["indices"]]["count"]
+            elif "POSITION" in primitive.get("attributes", {}):
+                count = accessors[primitive["attributes"]["POSITION"]]["count"]
+            else:
+                continue
+            mode = primitive.get("mode", 4)
+            if mode == 4:  # TRIANGLES
+                triangles += count // 3
+            elif mode in (5, 6):  # TRIANGLE_STRIP, TRIANGLE_FAN
+                triangles += max(count - 2, 0)
+    return triangles
+
+def validate_glb(path, min_triangles=1, max_triangles=None):
+    """
+    Run cheap checks on a GLB file: header, JSON chunk and triangle count bounds.
+    Returns the triangle count, or raises ArtifactValidationError.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+            chunk_header = f.read(8)
+            if len(header) < 12 or len(chunk_header) < 8:
+                raise ArtifactValidationError("file is too short to be a GLB")
+            magic, version, length = struct.unpack('<4sII', header)
+            if magic != b'glTF' or version != 2:
+                raise ArtifactValidationError("missing glTF 2.0 header")
+            if length != os.path.getsize(path):
+                raise ArtifactValidationError(f"header length {length} does not match file size {os.path.getsize(path)}")
+            chunk_length, chunk_type = struct.unpack('<I4s', chunk_header)
+            if chunk_type != b'JSON':
+                raise ArtifactValidationError("first chunk is not a JSON chunk")
+            gltf = json.loads(f.read(chunk_length))
+        triangles = count_glb_triangles(gltf)
+    except ArtifactValidationError as e:
+        raise ArtifactValidationError(f"Invalid GLB {path}: {str(e)}")
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        raise ArtifactValidationError(f"Invalid GLB {path}: could not parse JSON chunk: {str(e)}")
+
+    if triangles < min_triangles:
+        raise ArtifactValidationError(f"Invalid GLB {path}: {triangles} triangles is below the minimum of {min_triangles}")
+    if max_triangles is not None and triangles > max_triangles:
+        raise ArtifactValidationError(f"Invalid GLB {path}: {triangles} triangles is above the maximum of {max_triangles}")
+    return triangles
+
+def list_input_images(input_folder):
+    """
+    List the image files (supporting common extensions) in the input folder, sorted for predictable order.
+    """
+    valid_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+    return sorted(f for f in os.listdir(input_folder) if f.lower().endswith(valid_extensions))
+
+def upload_file(client, file_path):
+    """
+    Upload a local file to the server once and return a file reference that can be reused across predictions.
+    The reference points at the server's upload cache and carries no gradio.FileData "meta" key, so
+    gradio_client passes it through as-is instead of uploading the file again. The server accepts it because
+    the path is in its own upload folder. Requires gradio_client 1.x or newer (Client.httpx_kwargs).
+    """
+    try:
+        # Same request gradio_client makes for its own uploads, so auth, cookies and TLS settings carry over
+        with open(file_path, 'rb') as f:
+            response = httpx.post(client.upload_url, headers=client.headers, cookies=client.cookies,
+                                  verify=client.ssl_verify, files=[("files", (os.path.basename(file_path), f))],
+                                  **client.httpx_kwargs)
+        response.raise_for_status()
+        server_path = response.json()[0]
+    except Exception as e:
+        raise Exception(f"Failed to upload {file_path}: {str(e)}")
+    return {"path": server_path, "orig_name": os.path.basename(file_path)}
+
+def upload_inputs(client, **file_paths):
+    """
+    Upload every given input file once. Returns a dict mapping input names to reusable file references.
+    """
+    return {name: upload_file(client, path) for name, path in file_paths.items() if path}
+
 def generate_3d_model(text=None, image_path=None, texture=False, server_url="http://127.0.0.1:42003/", output_dir="output",
                       mv_image_front=None, mv_image_back=None, mv_image_left=None, mv_image_right=None,
-                      base_folder_name=None, **kwargs):
+                      base_folder_name=None, client=None, uploaded_inputs=None, **kwargs):
     """
     Generate a 3D model from a text prompt or an image using the Hunyuan3D-2 server and save it to an output folder.
+    An existing client and inputs already uploaded with upload_inputs() can be passed in to avoid reconnecting
+    and re-uploading the same files.
     """
     if text is None and image_path is None:
         raise ValueError("Either text or image_path must be provided.")
 
-    try:
-        client = Client(server_url)
-    except Exception as e:
-        raise Exception(f"Failed to connect to the server at {server_url}: {str(e)}")
+    if client is None:
+        try:
+            client = Client(server_url)
+        except Exception as e:
+            raise Exception(f"Failed to connect to the server at {server_url}: {str(e)}")
+
+    # Prepare inputs (reuse server-side references for files that were already uploaded)
+    uploaded_inputs = uploaded_inputs or {}
+
+    def prepare_input(name, path):
+        if name in uploaded_inputs:
+            return uploaded_inputs[name]
+        return handle_file(path) if path else None
 
-    # Prepare inputs
-    image = handle_file(image_path) if image_path else None
-    mv_front = handle_file(mv_image_front) if mv_image_front else None
-    mv_back = handle_file(mv_image_back) if mv_image_back else None
-    mv_left = handle_file(mv_image_left) if mv_image_left else None
-    mv_right = handle_file(mv_image_right) if mv_image_right else None
+    image = prepare_input('image_path', image_path)
+    mv_front = prepare_input('mv_image_front', mv_image_front)
+    mv_back = prepare_input('mv_image_back', mv_image_back)
+    mv_left = prepare_input('mv_image_left', mv_image_left)
+    mv_right = prepare_input('mv_image_right', mv_image_right)
     caption = text
 
     # Set default parameters
@@ -67,6 +186,7 @@ def generate_3d_model(text=None, image_path=None, texture=False, server_url="htt
     endpoint = "/generation_all" if texture else "/shape_generation"
 
     try:
+        predict_start = time.perf_counter()
         result = client.predict(
             caption=caption,
             image=image,
@@ -86,6 +206,11 @@ def generate_3d_model(text=None, image_path=None, texture=False, server_url="htt
     except Exception as e:
         raise Exception(f"Generation failed: {str(e)}")
 
+    # Callers that benchmark the server (auto-tune) only want the time spent in the prediction call
+    timings = kwargs.get('timings')
+    if timings is not None:
+        timings['predict'] = time.perf_counter() - predict_start
+
     file_info = result[1] if texture else result[0]
 
     if isinstance(file_info, dict) and 'value' in file_info:
@@ -132,7 +257,14 @@ def generate_3d_model(text=None, image_path=None, texture=False, server_url="htt
     except Exception as e:
         raise Exception(f"Failed to copy file to {output_path}: {str(e)}")
 
-    print(f"Model copied to: {output_path}")
+    # Validate the model before returning, so callers can retry on the same client while it is still connected
+    try:
+        triangles = validate_glb(output_path, kwargs.get('min_triangles', 1), kwargs.get('max_triangles'))
+    except ArtifactValidationError:
+        os.remove(output_path)
+        raise
+
+    print(f"Model copied to: {output_path} ({triangles} triangles)")
     return output_path
 
 # -----------------------
@@ -142,11 +274,10 @@ def automate_generation(input_folder, output_folder, mode='production', **params
     """
     Automatically scans the input folder for images and generates a 3D model (.glb) for each.
     In testing mode, only the first two images are processed.
+    Models that fail validation are retried right away with a new seed, up to max_retries times per image,
+    reusing the image's connection and upload.
     """
-    # List image files (supporting common extensions)
-    valid_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
-    image_files = [f for f in os.listdir(input_folder) if f.lower().endswith(valid_extensions)]
-    image_files.sort()  # sort for predictable order
+    image_files = list_input_images(input_folder)
 
     if not image_files:
         print("No image files found in the input folder.")
@@ -158,34 +289,408 @@ def automate_generation(input_folder, output_folder, mode='production', **params
     else:
         print(f"Running in production mode (processing all {len(image_files)} images).")
 
+    max_retries = params.get("max_retries", 2)
+    server_url = params.get("server_url", "http://127.0.0.1:42003/")
+
     for image_file in image_files:
         image_path = os.path.join(input_folder, image_file)
         # Use the image file name (without extension) as the base folder name (sanitize it)
         base_folder_name = re.sub(r'[\/:*?"<>|]', '_', os.path.splitext(image_file)[0])
         print(f"Processing image: {image_file}")
+
+        # One connection and upload per image, reused by the retries below
         try:
-            model_path = generate_3d_model(
-                text=None,
+            client = Client(server_url)
+            uploaded = upload_inputs(client, image_path=image_path)
+        except Exception as e:
+            print(f"Error processing {image_file}: {str(e)}\n")
+            continue
+
+        seed = params.get("seed", 1234)
+        randomize_seed = params.get("randomize_seed", True)
+        for attempt in range(max_retries + 1):
+            if attempt:
+                print(f"Retrying image: {image_file} (attempt {attempt + 1}, seed {seed})")
+            try:
+                model_path = generate_3d_model(
+                    text=None,
+                    image_path=image_path,
+                    texture=params.get("texture", False),
+                    server_url=server_url,
+                    output_dir=output_folder,
+                    client=client,
+                    uploaded_inputs=uploaded,
+                    steps=params.get("steps", 5),
+                    guidance_scale=params.get("guidance_scale", 5.0),
+                    seed=seed,
+                    octree_resolution=params.get("octree_resolution", 256),
+                    remove_background=params.get("remove_background", True),
+                    num_chunks=params.get("num_chunks", 8000),
+                    randomize_seed=randomize_seed,
+                    min_triangles=params.get("min_triangles", 1),
+                    max_triangles=params.get("max_triangles"),
+                    base_folder_name=base_folder_name
+                )
+                print(f"Success: Model saved to {model_path}\n")
+                break
+            except ArtifactValidationError as e:
+                print(f"Validation failed for {image_file}: {str(e)}")
+                seed, randomize_seed = random.randint(0, 2**31 - 1), False
+            except Exception as e:
+                print(f"Error processing {image_file}: {str(e)}\n")
+                break
+        else:
+            print(f"Giving up on {image_file} after {max_retries + 1} attempts.\n")
+
+# -----------------------
+# Sweep Mode Functionality
+# -----------------------
+def load_sweep_grid(spec):
+    """
+    Load a sweep grid from a JSON file path or a JSON string.
+    The grid maps parameter names to lists of values, e.g. {"seed": [1, 2], "texture": [false, true]}.
+    To use a different grid per input, map image file names to grids instead; "*" is used for all other images.
+    """
+    if os.path.exists(spec):
+        with open(spec, 'r') as f:
+            grid = json.load(f)
+    else:
+        grid = json.loads(spec)
+    if not isinstance(grid, dict):
+        raise ValueError("Sweep grid must be a JSON object.")
+    return grid
+
+def grid_for_input(grid_spec, image_file):
+    """Return the parameter grid that applies to the given input image"""
+    if grid_spec and all(isinstance(v, dict) for v in grid_spec.values()):
+        return grid_spec.get(image_file, grid_spec.get("*", {}))
+    return grid_spec
+
+def sweep_variants(grid, text=None, image_path=None, server_url="http://127.0.0.1:42003/", output_dir="output",
+                   mv_image_front=None, mv_image_back=None, mv_image_left=None, mv_image_right=None,
+                   base_folder_name=None, max_workers=2, **params):
+    """
+    Generate one 3D model per combination of the parameter grid for a single input.
+    The input files are uploaded once and shared by all variants, which are submitted concurrently.
+    Models are saved to output_dir/base_folder_name/variant_key/ and a manifest.json comparing the
+    variants is written to output_dir/base_folder_name/. A variant that fails validation is retried
+    with a new seed, up to max_retries times.
+    The manifest records queued_at/started_at/finished_at timestamps per variant; with max_workers > 1
+    the time between started_at and finished_at includes waiting in the server's queue.
+    """
+    if text is None and image_path is None:
+        raise ValueError("Either text or image_path must be provided.")
+
+    try:
+        client = Client(server_url)
+    except Exception as e:
+        raise Exception(f"Failed to connect to the server at {server_url}: {str(e)}")
+
+    uploaded = upload_inputs(client, image_path=image_path, mv_image_front=mv_image_front,
+                             mv_image_back=mv_image_back, mv_image_left=mv_image_left,
+                             mv_image_right=mv_image_right)
+
+    sweep_dir = os.path.join(output_dir, base_folder_name or str(uuid.uuid4()))
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    max_retries = params.pop("max_retries", 2)
+
+    # Expand the grid into variants; an explicit seed only takes effect when seed randomization is off
+    keys = list(grid)
+    variants = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        variant = dict(zip(keys, values))
+        variant_params = dict(params)
+        variant_params.update(variant)
+        if "seed" in variant and "randomize_seed" not in variant:
+            variant_params["randomize_seed"] = False
+        variant_key = "_".join(f"{k}-{v}" for k, v in variant.items()) or "default"
+        variant_key = re.sub(r'[\/:*?"<>|]', '_', variant_key)
+        variants.append((variant_key, variant, variant_params))
+
+    def run_variant(variant_key, variant, variant_params):
+        started_at = time.time()
+        attempt = 0
+        while True:
+            try:
+                model_path = generate_3d_model(
+                    text=text,
+                    image_path=image_path,
+                    server_url=server_url,
+                    output_dir=sweep_dir,
+                    mv_image_front=mv_image_front,
+                    mv_image_back=mv_image_back,
+                    mv_image_left=mv_image_left,
+                    mv_image_right=mv_image_right,
+                    base_folder_name=variant_key,
+                    client=client,
+                    uploaded_inputs=uploaded,
+                    **variant_params
+                )
+                status, error = "ok", None
+            except ArtifactValidationError as e:
+                model_path, status, error = None, "invalid", str(e)
+                print(f"Validation failed for variant {variant_key}: {error}")
+                if attempt < max_retries:
+                    attempt += 1
+                    variant_params = dict(variant_params, seed=random.randint(0, 2**31 - 1), randomize_seed=False)
+                    print(f"Retrying variant {variant_key} with seed {variant_params['seed']}")
+                    continue
+            except Exception as e:
+                model_path, status, error = None, "error", str(e)
+                print(f"Error in variant {variant_key}: {error}")
+            break
+        return {
+            "variant_key": variant_key,
+            "params": variant,
+            "attempts": attempt + 1,
+            "seed": None if variant_params.get("randomize_seed", True) else variant_params.get("seed"),
+            "status": status,
+            "output_path": os.path.relpath(model_path, sweep_dir) if model_path else None,
+            "queued_at": round(queued_at, 3),
+            "started_at": round(started_at, 3),
+            "finished_at": round(time.time(), 3),
+            "error": error
+        }
+
+    print(f"Running {len(variants)} variants with up to {max_workers} concurrent requests.")
+    queued_at = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda v: run_variant(*v), variants))
+
+    manifest = {
+        "base_folder_name": os.path.basename(sweep_dir),
+        "text": text,
+        "image_path": image_path,
+        "mv_images": {"front": mv_image_front, "back": mv_image_back, "left": mv_image_left, "right": mv_image_right},
+        "base_params": params,
+        "grid": grid,
+        "variants": results
+    }
+    manifest_path = os.path.join(sweep_dir, "manifest.json")
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Sweep manifest saved to: {manifest_path}")
+    return manifest_path
+
+def automate_sweep(input_folder, output_folder, grid_spec, mode='production', max_workers=2, **params):
+    """
+    Run a parameter sweep for each image in the input folder.
+    In testing mode, only the first two images are processed.
+    """
+    image_files = list_input_images(input_folder)
+
+    if not image_files:
+        print("No image files found in the input folder.")
+        return
+
+    if mode == 'testing':
+        image_files = image_files[:2]
+        print("Running sweep in testing mode (processing only 2 images).")
+    else:
+        print(f"Running sweep in production mode (processing all {len(image_files)} images).")
+
+    for image_file in image_files:
+        image_path = os.path.join(input_folder, image_file)
+        base_folder_name = re.sub(r'[\/:*?"<>|]', '_', os.path.splitext(image_file)[0])
+        print(f"Sweeping image: {image_file}")
+        try:
+            manifest_path = sweep_variants(
+                grid_for_input(grid_spec, image_file),
                 image_path=image_path,
-                texture=params.get("texture", False),
                 output_dir=output_folder,
-                steps=params.get("steps", 5),
-                guidance_scale=params.get("guidance_scale", 5.0),
-                seed=params.get("seed", 1234),
-                octree_resolution=params.get("octree_resolution", 256),
-                remove_background=params.get("remove_background", True),
-                num_chunks=params.get("num_chunks", 8000),
-                randomize_seed=params.get("randomize_seed", True),
-                base_folder_name=base_folder_name
+                base_folder_name=base_folder_name,
+                max_workers=max_workers,
+                **params
             )
-            print(f"Success: Model saved to {model_path}\n")
+            print(f"Success: Sweep manifest saved to {manifest_path}\n")
         except Exception as e:
-            print(f"Error processing {image_file}: {str(e)}\n")
+            print(f"Error sweeping {image_file}: {str(e)}\n")
+
+# -----------------------
+# Auto-Tune Functionality
+# -----------------------
+DEFAULT_PROFILE_PATH = "tuning_profile.json"
+
+# Candidate (octree_resolution, steps) pairs for each quality tier, best first.
+# If the server cannot handle the first pair at any chunk size, the next one is tried.
+QUALITY_TIERS = {
+    "draft": [(128, 5), (64, 5)],
+    "standard": [(256, 5), (196, 5), (128, 5)],
+    "high": [(384, 30), (256, 30), (256, 20)],
+}
+
+CALIBRATION_NUM_CHUNKS = [2000, 4000, 8000, 16000, 32000]
+CALIBRATION_SAMPLES = 2
+CALIBRATION_CAPTION = "a wooden chair"
+
+def is_oom_error(error):
+    """
+    Check whether a generation error was caused by the server running out of GPU memory.
+    """
+    message = str(error).lower()
+    return "out of memory" in message or "outofmemory" in message or "oom" in message.split()
+
+def autotune_server(server_url="http://127.0.0.1:42003/", quality="standard", image_path=None, texture=False,
+                    profile_path=DEFAULT_PROFILE_PATH, num_chunks_candidates=None, samples=CALIBRATION_SAMPLES):
+    """
+    Run a short calibration sweep against the server and save a tuning profile.
+    After one untimed warm-up run, every num_chunks candidate of each (octree_resolution, steps) pair of the
+    quality tier is sampled several times and scored by the median duration of the prediction call alone.
+    A sample whose mesh fails validation still counts, since the prediction was timed; the setting is then
+    recorded as "invalid". Candidates above a num_chunks that ran out of memory are skipped.
+    The first pair with at least one timed setting wins, together with its fastest num_chunks.
+    """
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Unknown quality tier '{quality}'. Choose from: {', '.join(QUALITY_TIERS)}.")
+    num_chunks_candidates = num_chunks_candidates or CALIBRATION_NUM_CHUNKS
+    caption = None if image_path else CALIBRATION_CAPTION
+
+    # One connection and one upload for the whole sweep, so only the generation itself is measured
+    try:
+        client = Client(server_url)
+    except Exception as e:
+        raise Exception(f"Failed to connect to the server at {server_url}: {str(e)}")
+    uploaded = upload_inputs(client, image_path=image_path)
+
+    results = []
+    best = None
+    calibration_dir = tempfile.mkdtemp(prefix="hunyuan_autotune_")
+
+    def run_calibration(octree_resolution, steps, num_chunks):
+        """Run one calibration generation and return (prediction duration, whether the mesh was valid)"""
+        timings = {}
+        try:
+            generate_3d_model(
+                text=caption,
+                image_path=image_path,
+                texture=texture,
+                server_url=server_url,
+                output_dir=calibration_dir,
+                client=client,
+                uploaded_inputs=uploaded,
+                steps=steps,
+                octree_resolution=octree_resolution,
+                num_chunks=num_chunks,
+                seed=1234,
+                randomize_seed=False,
+                timings=timings
+            )
+        except ArtifactValidationError:
+            return timings["predict"], False
+        return timings["predict"], True
+
+    try:
+        # Warm-up run so model loading and cold-start cost are not charged to the first candidate
+        octree_resolution, steps = QUALITY_TIERS[quality][-1]
+        print(f"Warming up: octree_resolution={octree_resolution}, steps={steps}, num_chunks={num_chunks_candidates[0]}")
+        try:
+            run_calibration(octree_resolution, steps, num_chunks_candidates[0])
+        except Exception as e:
+            print(f"  -> warm-up failed: {str(e)}")
+
+        for octree_resolution, steps in QUALITY_TIERS[quality]:
+            for num_chunks in num_chunks_candidates:
+                print(f"Calibrating: octree_resolution={octree_resolution}, steps={steps}, num_chunks={num_chunks}")
+                durations = []
+                status = "ok"
+                error = None
+                for _ in range(samples):
+                    try:
+                        duration, valid = run_calibration(octree_resolution, steps, num_chunks)
+                    except Exception as e:
+                        status = "oom" if is_oom_error(e) else "error"
+                        error = str(e)
+                        break
+                    durations.append(duration)
+                    if not valid:
+                        status = "invalid"
+                        error = "generated mesh failed validation"
+                timed = status in ("ok", "invalid")
+                latency = statistics.median(durations) if timed else None
+                results.append({
+                    "octree_resolution": octree_resolution,
+                    "steps": steps,
+                    "num_chunks": num_chunks,
+                    "status": status,
+                    "latency": round(latency, 3) if latency is not None else None,
+                    "samples": [round(d, 3) for d in durations],
+                    "error": error
+                })
+                if timed:
+                    print(f"  -> {status}, median {latency:.1f}s over {len(durations)} runs")
+                else:
+                    print(f"  -> {status}: {error}")
+                if timed and (best is None or latency < best["latency"]):
+                    best = results[-1]
+                if status == "oom":
+                    # Candidates run in ascending order, so every larger num_chunks would run out of memory too
+                    break
+            if best is not None:
+                break
+    finally:
+        shutil.rmtree(calibration_dir, ignore_errors=True)
+
+    if best is None:
+        raise Exception(f"Calibration failed: no setting for quality tier '{quality}' succeeded on {server_url}.")
+
+    profile = {
+        "server_url": server_url,
+        "quality": quality,
+        "texture": texture,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "steps": best["steps"],
+        "octree_resolution": best["octree_resolution"],
+        "num_chunks": best["num_chunks"],
+        "results": results
+    }
+    save_tuning_profile(profile_path, profile)
+    print(f"Selected steps={profile['steps']}, octree_resolution={profile['octree_resolution']}, "
+          f"num_chunks={profile['num_chunks']} (median {best['latency']:.1f}s)")
+    print(f"Tuning profile saved to: {profile_path}")
+    return profile
+
+def save_tuning_profile(profile_path, profile):
+    """Save a tuning profile to a JSON file"""
+    with open(profile_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+def server_address(server_url):
+    """
+    Return the (host, port) a server URL points at, treating localhost and the loopback IPs as the same host.
+    """
+    parsed = urllib.parse.urlparse(server_url if "://" in server_url else f"http://{server_url}")
+    host = (parsed.hostname or "").lower()
+    if host in ("localhost", "::1") or host.startswith("127."):
+        host = "127.0.0.1"
+    return host, parsed.port or (443 if parsed.scheme == "https" else 80)
+
+def load_tuning_profile(profile_path=DEFAULT_PROFILE_PATH, server_url=None, texture=None):
+    """
+    Load a tuning profile from a JSON file, or return None if there is no usable profile.
+    A profile calibrated against a different server is ignored, since each GPU has its own sweet spot.
+    """
+    if not profile_path or not os.path.exists(profile_path):
+        return None
+    try:
+        with open(profile_path, 'r') as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read tuning profile {profile_path}: {str(e)}")
+        return None
+    if server_url and server_address(str(profile.get("server_url", ""))) != server_address(server_url):
+        print(f"Warning: ignoring tuning profile {profile_path}, it was calibrated for {profile.get('server_url')} "
+              f"not {server_url}. Run --autotune against this server to create one.")
+        return None
+    if texture is not None and profile.get("texture") != texture:
+        print(f"Warning: tuning profile {profile_path} was calibrated for "
+              f"{'textured' if profile.get('texture') else 'white'} models.")
+    return profile
 
 # -----------------------
 # GUI Mode Functionality
 # -----------------------
-def run_gui():
+def run_gui(profile=None, server_url="http://127.0.0.1:42003/"):
     root = tk.Tk()
     root.title("3D Model Generator")
 
@@ -224,11 +729,12 @@ def run_gui():
     tk.Button(mv_frame, text="Select Left Image", command=lambda: select_image(left_path)).grid(row=1, column=0)
     tk.Button(mv_frame, text="Select Right Image", command=lambda: select_image(right_path)).grid(row=1, column=1)
 
-    # Parameters Frame Widgets
+    # Parameters Frame Widgets (defaults come from the tuning profile when one is available)
+    profile = profile or {}
     row = 0
     tk.Label(params_frame, text="Steps:").grid(row=row, column=0, sticky="w")
     steps_entry = tk.Entry(params_frame)
-    steps_entry.insert(0, "5")
+    steps_entry.insert(0, str(profile.get("steps", 5)))
     steps_entry.grid(row=row, column=1)
     row += 1
     tk.Label(params_frame, text="Guidance Scale:").grid(row=row, column=0, sticky="w")
@@ -243,7 +749,7 @@ def run_gui():
     row += 1
     tk.Label(params_frame, text="Octree Resolution:").grid(row=row, column=0, sticky="w")
     octree_entry = tk.Entry(params_frame)
-    octree_entry.insert(0, "256")
+    octree_entry.insert(0, str(profile.get("octree_resolution", 256)))
     octree_entry.grid(row=row, column=1)
     row += 1
     remove_bg_var = tk.BooleanVar(value=True)
@@ -251,7 +757,7 @@ def run_gui():
     row += 1
     tk.Label(params_frame, text="Num Chunks:").grid(row=row, column=0, sticky="w")
     chunks_entry = tk.Entry(params_frame)
-    chunks_entry.insert(0, "8000")
+    chunks_entry.insert(0, str(profile.get("num_chunks", 8000)))
     chunks_entry.grid(row=row, column=1)
     row += 1
     randomize_seed_var = tk.BooleanVar(value=True)
@@ -358,6 +864,7 @@ def run_gui():
                 text=caption,
                 image_path=image_path,
                 texture=texture,
+                server_url=server_url,
                 output_dir=output_dir,
                 mv_image_front=mv_front,
                 mv_image_back=mv_back,
@@ -391,27 +898,73 @@ def main():
     parser.add_argument("--input_folder", type=str, help="Path to the input folder containing images")
     parser.add_argument("--output_folder", type=str, default="output", help="Path to the output folder")
     # Additional parameters for generation in automation mode
-    parser.add_argument("--steps", type=int, default=5, help="Number of inference steps")
+    parser.add_argument("--steps", type=int, default=None, help="Number of inference steps (default: tuning profile or 5)")
     parser.add_argument("--guidance_scale", type=float, default=5.0, help="Guidance scale")
     parser.add_argument("--seed", type=int, default=1234, help="Seed for random number generation")
-    parser.add_argument("--octree_resolution", type=int, default=256, help="Octree resolution")
+    parser.add_argument("--octree_resolution", type=int, default=None, help="Octree resolution (default: tuning profile or 256)")
     parser.add_argument("--remove_background", action="store_true", help="Remove background flag")
-    parser.add_argument("--num_chunks", type=int, default=8000, help="Number of chunks")
+    parser.add_argument("--num_chunks", type=int, default=None, help="Number of chunks (default: tuning profile or 8000)")
     parser.add_argument("--randomize_seed", action="store_true", help="Randomize seed flag")
     # New flag: only used in automation mode to generate textured models.
     parser.add_argument("--automation_texture", action="store_true", help="In automation mode, generate textured model")
     # Existing texture flag (remains available for GUI mode)
     parser.add_argument("--texture", action="store_true", help="Generate textured model (for GUI mode)")
+    # Auto-tune calibration
+    parser.add_argument("--autotune", action="store_true",
+                        help="Run a calibration sweep against the server and save a tuning profile")
+    parser.add_argument("--quality", choices=list(QUALITY_TIERS), default="standard",
+                        help="Target quality tier for --autotune")
+    parser.add_argument("--server_url", type=str, default="http://127.0.0.1:42003/", help="Hunyuan3D-2 server URL")
+    parser.add_argument("--profile", type=str, default=DEFAULT_PROFILE_PATH,
+                        help="Path of the tuning profile written by --autotune and loaded by other runs")
+    # Sweep mode
+    parser.add_argument("--sweep", type=str, default=None,
+                        help="In automation mode, a JSON parameter grid (or path to a JSON file) to generate variants per image")
+    parser.add_argument("--max_workers", type=int, default=2, help="Number of concurrent variant requests in sweep mode")
+    # Output validation
+    parser.add_argument("--min_triangles", type=int, default=1, help="Minimum triangle count of a valid model")
+    parser.add_argument("--max_triangles", type=int, default=None, help="Maximum triangle count of a valid model")
+    parser.add_argument("--max_retries", type=int, default=2,
+                        help="In automation mode, how often an invalid model is requeued with a new seed")
     args = parser.parse_args()
 
+    if args.autotune:
+        image_path = None
+        if args.input_folder:
+            image_files = list_input_images(args.input_folder)
+            if image_files:
+                image_path = os.path.join(args.input_folder, image_files[0])
+        try:
+            autotune_server(
+                server_url=args.server_url,
+                quality=args.quality,
+                image_path=image_path,
+                texture=args.automation_texture,
+                profile_path=args.profile
+            )
+        except Exception as e:
+            print(f"Error during auto-tune: {str(e)}")
+        return
+
+    # Parameters not given on the command line fall back to the tuning profile, then to built-in defaults
+    profile = load_tuning_profile(args.profile, server_url=args.server_url,
+                                  texture=args.automation_texture if args.automation else None)
+    if profile:
+        print(f"Using tuning profile {args.profile} (quality: {profile.get('quality')})")
+    else:
+        profile = {}
+    if args.steps is None:
+        args.steps = profile.get("steps", 5)
+    if args.octree_resolution is None:
+        args.octree_resolution = profile.get("octree_resolution", 256)
+    if args.num_chunks is None:
+        args.num_chunks = profile.get("num_chunks", 8000)
+
     if args.automation:
         if not args.input_folder:
             print("Error: --input_folder is required when running in automation mode.")
             return
-        automate_generation(
-            input_folder=args.input_folder,
-            output_folder=args.output_folder,
-            mode=args.mode,
+        params = dict(
             steps=args.steps,
             guidance_scale=args.guidance_scale,
             seed=args.seed,
@@ -419,10 +972,24 @@ def main():
             remove_background=args.remove_background,
             num_chunks=args.num_chunks,
             randomize_seed=args.randomize_seed,
-            texture=args.automation_texture  # use the automation-specific flag
+            texture=args.automation_texture,  # use the automation-specific flag
+            server_url=args.server_url,
+            min_triangles=args.min_triangles,
+            max_triangles=args.max_triangles,
+            max_retries=args.max_retries
         )
+        if args.sweep:
+            try:
+                grid_spec = load_sweep_grid(args.sweep)
+            except Exception as e:
+                print(f"Error loading sweep grid: {str(e)}")
+                return
+            automate_sweep(args.input_folder, args.output_folder, grid_spec, mode=args.mode,
+                           max_workers=args.max_workers, **params)
+        else:
+            automate_generation(args.input_folder, args.output_folder, mode=args.mode, **params)
     else:
-        run_gui()
+        run_gui(profile, server_url=args.server_url)
 
 if __name__ == "__main__":
     main()